@@ -1,17 +1,24 @@
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import ahocorasick  # pyahocorasick: optional, speeds up schema-name matching
+except ImportError:
+    ahocorasick = None
+
 # --- Configuration ---
 # Directories to completely ignore
-IGNORED_DIRS = {
+IGNORED_DIRS = frozenset({
     ".git", "__pycache__", "node_modules", "venv", ".venv",
     ".idea", ".vscode", "build", "dist", "docs",
     ".parcel-cache", ".cache", ".next", ".husky", ".pnpm-store",
     "coverage", "tmp", "temp", ".terraform"
-}
+})
 
 # File extensions to ignore (binary/large or non-source)
-IGNORED_EXTENSIONS = {
+IGNORED_EXTENSIONS = frozenset({
     ".pyc", ".pyo", ".pyd", ".so", ".dll", ".exe",
     ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".ico",
     ".svg", ".webp", ".avif",
@@ -22,141 +29,260 @@ IGNORED_EXTENSIONS = {
     ".lock", ".log",
     ".parquet", ".h5", ".hdf5", ".pt", ".onnx", ".tif", ".tiff",
     ".shp", ".dbf", ".nc"
-}
+})
 
 # Individual files to ignore (by name)
-IGNORED_FILENAMES = {
+IGNORED_FILENAMES = frozenset({
     "yarn.lock", "pnpm-lock.yaml", "package-lock.json",
     ".DS_Store", ".env", ".env.local", ".env.production", ".env.development",
     ".python-version", ".tool-versions",
-}
+})
 
 # Max file size to read (in bytes). Skip anything larger.
 MAX_FILE_SIZE_BYTES = 2 * 1024 * 1024  # 2 MB
 
 # Prefer to read only these code-like extensions unless a file looks like a schema
-ALLOWED_CODE_EXTENSIONS = {
+ALLOWED_CODE_EXTENSIONS = frozenset({
     ".py", ".ts", ".tsx", ".js", ".jsx", ".java", ".kt", ".go",
     ".rs", ".rb", ".php", ".c", ".cc", ".cpp", ".h", ".hpp",
     ".cs", ".sql", ".yml", ".yaml", ".toml", ".ini", ".cfg",
     ".prisma", ".graphql", ".gql", ".md"  # md is helpful for schema notes
-}
+})
 
 # Heuristics: paths that often contain DB schema or migrations
-SCHEMA_HINT_DIRS = {
+SCHEMA_HINT_DIRS = frozenset({
     "prisma", "migrations", "migration", "db", "database",
     "sql", "schema", "alembic", "migrate", "migrations_sql", "liquibase", "flyway"
-}
+})
 
 # Heuristics: filenames/patterns that look like schema/migration definitions
-SCHEMA_HINT_NAMES = {
+SCHEMA_HINT_NAMES = frozenset({
     "schema.prisma", "schema.sql", "init.sql", "migration.sql",
     "migration", "migrations", "entities", "models", "alembic.ini",
     "seeder", "seed.sql", "DDL.sql"
-}
-
-def looks_like_schema_file(path: Path) -> bool:
-    """Detect files that likely contain DB schema or table definitions."""
-    name = path.name.lower()
-    parts = {p.lower() for p in path.parts}
-
+})
+
+# Data files (kept only when small and schema-like)
+_DATA_EXTENSIONS = frozenset({".csv", ".json", ".jsonl", ".ndjson", ".geojson"})
+
+# One suffix -> category table so the hot path hashes each suffix once
+# instead of probing three separate sets (the sets are disjoint)
+_EXT_CLASS = {}
+for _ext in IGNORED_EXTENSIONS:
+    _EXT_CLASS[_ext] = "ignored"
+for _ext in ALLOWED_CODE_EXTENSIONS:
+    _EXT_CLASS[_ext] = "code"
+for _ext in _DATA_EXTENSIONS:
+    _EXT_CLASS[_ext] = "data"
+del _ext
+
+# Heuristics: ORM entity/model directories and the code extensions kept there
+_ORM_DIR_HINTS = frozenset({"entities", "entity", "models", "model"})
+_ORM_CODE_EXTENSIONS = frozenset({".ts", ".js", ".tsx", ".jsx", ".py", ".rb", ".java", ".kt"})
+
+# Compiled once at import: a single automaton pass over a filename replaces
+# one substring scan per entry in SCHEMA_HINT_NAMES
+if ahocorasick is not None:
+    _schema_ac = ahocorasick.Automaton()
+    for _key in SCHEMA_HINT_NAMES:
+        _schema_ac.add_word(_key.lower(), _key)
+    _schema_ac.make_automaton()
+else:
+    _schema_ac = None
+
+# Fallback when pyahocorasick is absent: a compiled alternation so matching is
+# still one engine pass per name, not one substring scan per hint token
+# (longest tokens first so overlapping hints match greedily)
+_SCHEMA_NAME_RE = re.compile(
+    "|".join(sorted((re.escape(k.lower()) for k in SCHEMA_HINT_NAMES),
+                    key=len, reverse=True)))
+
+def _name_has_schema_hint(name: str) -> bool:
+    """True if any SCHEMA_HINT_NAMES token occurs in the (lowercase) name."""
+    if _schema_ac is not None:
+        return next(_schema_ac.iter(name), None) is not None
+    return _SCHEMA_NAME_RE.search(name) is not None
+
+def looks_like_schema_file(name: str, suffix: str, dir_is_schema: bool,
+                           dir_is_orm: bool) -> bool:
+    """Detect files that likely contain DB schema or table definitions.
+
+    ``name`` and ``suffix`` must already be lowercased; ``dir_is_schema`` /
+    ``dir_is_orm`` say whether any component of the containing directory is a
+    schema or ORM hint — the walker computes them once per directory.
+    """
     # Strong hints: directories that typically hold schema/migrations
-    if parts & SCHEMA_HINT_DIRS:
+    if dir_is_schema:
         return True
 
     # Filenames that scream 'schema/migration'
-    for key in SCHEMA_HINT_NAMES:
-        if key in name:
-            return True
+    if _name_has_schema_hint(name):
+        return True
 
     # SQL files are often schema; keep them
-    if path.suffix.lower() == ".sql":
+    if suffix == ".sql":
         return True
 
     # Prisma schema
-    if path.suffix.lower() == ".prisma":
+    if suffix == ".prisma":
         return True
 
     # ORM entity/model files are valuable
-    if any(seg in parts for seg in {"entities", "entity", "models", "model"}):
-        return path.suffix.lower() in {".ts", ".js", ".tsx", ".jsx", ".py", ".rb", ".java", ".kt"}
+    if dir_is_orm:
+        return suffix in _ORM_CODE_EXTENSIONS
 
     return False
 
-def is_large(path: Path) -> bool:
+def is_large(entry: os.DirEntry, follow_symlinks: bool = False) -> bool:
     try:
-        return path.stat().st_size > MAX_FILE_SIZE_BYTES
+        # DirEntry caches the stat result, so repeated calls cost one syscall at most
+        return entry.stat(follow_symlinks=follow_symlinks).st_size > MAX_FILE_SIZE_BYTES
     except Exception:
         # If we can't stat, treat it as not large so the normal ignore rules apply
         return False
 
-def is_ignored(path: Path, output_filename: str) -> bool:
-    """Check if a file or directory should be ignored."""
-    # Ignore the output file itself
-    if path.name == output_filename:
-        return True
-
-    # Ignore specific filenames
-    if path.name in IGNORED_FILENAMES:
-        return True
-
-    # Ignore directories by any segment
-    if any(part in IGNORED_DIRS for part in path.parts):
-        return True
+def classify(entry: os.DirEntry, dir_is_schema: bool, dir_is_orm: bool,
+             output_filename: str) -> tuple:
+    """Decide in one pass whether a file entry is ignored and whether it is schema-like.
 
-    # Skip large files
-    if path.is_file() and is_large(path):
-        return True
+    Returns ``(ignored, is_schema)``. Directory pruning happens on a bare
+    name check in the walker, so this only inspects the entry itself plus
+    the precomputed per-directory schema/ORM hints; the schema heuristics run
+    at most once per entry.
+    """
+    name = entry.name
 
-    # Ignore obvious data files (csv/json/jsonl/ndjson/geojson) unless they are tiny and inside schema dirs
-    if path.suffix.lower() in {".csv", ".json", ".jsonl", ".ndjson", ".geojson"}:
-        # allow only if it looks like schema/meta and small
-        if not looks_like_schema_file(path) or is_large(path):
-            return True
-
-    # Ignore by extension if it's not code-like AND not a schema-like file
-    if path.is_file():
-        if looks_like_schema_file(path):
-            return False  # keep schema-like files regardless of extension limits
-        # Otherwise keep only code-like files
-        if path.suffix.lower() not in ALLOWED_CODE_EXTENSIONS:
-            return True
-
-    # Finally, block anything with explicitly ignored extensions
-    if path.suffix.lower() in IGNORED_EXTENSIONS:
-        return True
-
-    return False
+    # Ignore the output file itself
+    if name == output_filename:
+        return True, False
 
-def generate_tree(root_path: Path, output_filename: str):
-    """Generates the directory tree structure and returns a list of files to process."""
+    # Ignore specific filenames
+    if name in IGNORED_FILENAMES:
+        return True, False
+
+    # Ignore directories by name
+    if name in IGNORED_DIRS:
+        return True, False
+
+    # Directories were split off in the walker, so a non-regular entry here
+    # is a symlink (or special file). Resolve it the way the old Path checks
+    # did: keep only links to regular files, and size-check the target
+    follow = False
+    if not entry.is_file(follow_symlinks=False):
+        try:
+            if not entry.is_file():  # follows symlinks
+                return True, False  # dangling, or resolves to a directory
+        except OSError:
+            return True, False
+        follow = True
+
+    # Skip large files; the DirEntry caches the stat result from scandir so
+    # this costs at most one syscall
+    if is_large(entry, follow):
+        return True, False
+
+    lower = name.lower()
+    suffix = os.path.splitext(lower)[1]
+    ext_class = _EXT_CLASS.get(suffix)
+
+    is_schema = looks_like_schema_file(lower, suffix, dir_is_schema, dir_is_orm)
+
+    # Ignore obvious data files (csv/json/jsonl/ndjson/geojson) unless they
+    # look like schema/meta (large ones were already dropped above)
+    if ext_class == "data" and not is_schema:
+        return True, False
+
+    if is_schema:
+        return False, True  # keep schema-like files regardless of extension limits
+
+    # Otherwise keep only code-like files; explicitly ignored extensions are
+    # disjoint from the code set, so this covers them too
+    if ext_class != "code":
+        return True, False
+
+    return False, False
+
+def generate_tree(root_path: Path, output_filename: str, sort_output: bool = True):
+    """Generates the directory tree structure and returns the files to process.
+
+    Files come back as ``(absolute_path, relative_path)`` pairs and schema
+    files as relative paths, both assembled during the walk so the dump phase
+    never re-derives them. ``sort_output=False`` skips the per-directory
+    filename sort for callers that don't need deterministic ordering.
+    """
     tree_lines = []
     files_to_dump = []
     schema_files = []
 
-    for root, dirs, files in os.walk(root_path, topdown=True):
-        # Filter out ignored directories
-        dirs[:] = [d for d in dirs if not is_ignored(Path(root) / d, output_filename)]
-
-        level = root.replace(str(root_path), '').count(os.sep)
-        indent = ' ' * 4 * level
-
-        # Add the current directory to the tree
-        if level > 0 or root == str(root_path):
-            dir_name = os.path.basename(root)
-            if dir_name:
-                tree_lines.append(f'{indent}📂 {dir_name}/')
-
-        sub_indent = ' ' * 4 * (level + 1)
-        for f in sorted(files):
-            file_path = Path(root) / f
-            if not is_ignored(file_path, output_filename):
-                mark = "📄"
-                if looks_like_schema_file(file_path):
-                    mark = "🗄️"  # mark likely schema files
-                    schema_files.append(file_path)
-                tree_lines.append(f'{sub_indent}{mark} {f}')
-                files_to_dump.append(file_path)
+    def _scan(dir_path: str, dir_name: str, dir_is_schema: bool,
+              dir_is_orm: bool, indent: str, rel_prefix: str):
+        if dir_name:
+            tree_lines.append(f'{indent}📂 {dir_name}/')
+        # The child's indent is this directory's sub-indent; build it once and
+        # hand it down rather than re-multiplying from a depth counter
+        sub_indent = indent + '    '
+
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            return
+
+        # Split into kept files and kept subdirectories; the DirEntry carries
+        # cached type/size info so no extra stat calls are needed, and
+        # classify hands back the schema flag so it isn't recomputed below
+        subdirs = []
+        kept_files = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                # Pruned directories (.git, node_modules, ...) die on this one
+                # name check; the rest of the classify chain is for files
+                name = entry.name
+                if name not in IGNORED_DIRS and name != output_filename:
+                    subdirs.append(entry)
+            else:
+                ignored, is_schema = classify(entry, dir_is_schema, dir_is_orm, output_filename)
+                if not ignored:
+                    kept_files.append((entry, is_schema))
+
+        # Ignored entries are already filtered out, so only survivors get
+        # sorted — in place, no copy
+        if sort_output:
+            kept_files.sort(key=lambda item: item[0].name)
+
+        for entry, is_schema in kept_files:
+            # Relative path assembled from the directory prefix; the dump
+            # phase reuses it instead of re-deriving it per file
+            rel = rel_prefix + entry.name
+            mark = "📄"
+            if is_schema:
+                mark = "🗄️"  # mark likely schema files
+                schema_files.append(rel)
+            tree_lines.append(f'{sub_indent}{mark} {entry.name}')
+            files_to_dump.append((entry.path, rel))
+
+        for entry in subdirs:
+            # Extend the per-directory hints with the child's own name; no set
+            # unions or parts tuples per file
+            child = entry.name.lower()
+            _scan(entry.path, entry.name,
+                  dir_is_schema or child in SCHEMA_HINT_DIRS,
+                  dir_is_orm or child in _ORM_DIR_HINTS, sub_indent,
+                  rel_prefix + entry.name + os.sep)
+
+    root = Path(root_path)
+    # Path('.').name is '' — fall back to the resolved directory name so
+    # inputs like '.' or '..' still get their root tree line
+    root_name = root.name or os.path.basename(os.path.abspath(root))
+    root_parts = frozenset(root.parts)
+    if root_parts & IGNORED_DIRS:
+        # The root itself sits under an ignored directory: emit just its own
+        # line, exactly as the per-file ancestor checks used to decide
+        if root_name:
+            tree_lines.append(f'📂 {root_name}/')
+    else:
+        root_lower = frozenset(p.lower() for p in root.parts)
+        _scan(str(root), root_name, bool(root_lower & SCHEMA_HINT_DIRS),
+              bool(root_lower & _ORM_DIR_HINTS), '', '')
 
     return "\n".join(tree_lines), files_to_dump, schema_files
 
@@ -182,39 +308,56 @@ def main():
         tree_structure, files_to_dump, schema_files = generate_tree(project_path, output_filename)
         output_path = project_path / output_filename
 
-        with open(output_path, "w", encoding="utf-8", errors="ignore") as f:
-            f.write(f"Project: {project_path.resolve().name}\n\n")
-            f.write("--- REPO TREE STRUCTURE ---\n\n")
-            f.write(tree_structure)
-            f.write("\n\n" + "="*80 + "\n\n")
-
-            # Highlight schema files up front
-            f.write("--- LIKELY DB SCHEMA / MIGRATION FILES ---\n\n")
+        with open(output_path, "wb", buffering=1 << 20) as f:
+            # Assemble the whole prelude (header, tree, schema list) and
+            # write it in one go
+            prelude = [
+                f"Project: {project_path.resolve().name}\n\n",
+                "--- REPO TREE STRUCTURE ---\n\n",
+                tree_structure,
+                "\n\n" + "="*80 + "\n\n",
+                # Highlight schema files up front
+                "--- LIKELY DB SCHEMA / MIGRATION FILES ---\n\n",
+            ]
             if schema_files:
-                for p in schema_files:
-                    f.write(f"- {p.relative_to(project_path)}\n")
+                prelude.extend(f"- {rel}\n" for rel in schema_files)
             else:
-                f.write("(none detected)\n")
-            f.write("\n" + "="*80 + "\n\n")
-
-            f.write("--- FILE CONTENTS ---\n\n")
-            for file_path in files_to_dump:
-                relative_path = file_path.relative_to(project_path)
-                f.write("="*20 + f" FILE: {relative_path} " + "="*20 + "\n\n")
+                prelude.append("(none detected)\n")
+            prelude.append("\n" + "="*80 + "\n\n")
+            prelude.append("--- FILE CONTENTS ---\n\n")
+            f.write("".join(prelude).encode("utf-8"))
+
+            def produce(item: tuple) -> bytes:
+                """Read one file and return its ready-to-write dump chunk."""
+                file_path, rel = item
+                header = ("="*20 + f" FILE: {rel} " + "="*20 + "\n\n").encode("utf-8")
                 try:
-                    # Read text; binary-ish files will be skipped earlier
-                    content = file_path.read_text(encoding="utf-8")
-                    f.write(content)
-                    f.write("\n\n")
-                except Exception as e:
-                    f.write(f"[Could not read file: {e}]\n\n")
+                    # Raw bytes, no decode/encode round-trip; the 2 MB size cap
+                    # keeps in-flight buffers small
+                    with open(file_path, "rb") as src:
+                        head = src.read(8192)
+                        # git-style binary sniff: a NUL byte in the first 8 KB
+                        # means this isn't text worth dumping
+                        if b"\x00" in head:
+                            return header + b"[Binary file skipped]\n\n"
+                        content = head + src.read()
+                except OSError as e:
+                    return header + f"[Could not read file: {e}]\n\n".encode("utf-8")
+                return b"".join([header, content, b"\n\n"])
+
+            # Reads overlap in the pool (they release the GIL); executor.map
+            # preserves order so the single writer keeps the dump deterministic
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for chunk in executor.map(produce, files_to_dump):
+                    f.write(chunk)
 
         print(f"\n✅ Success! Project dump created at: {output_path.resolve()}")
         print(f"Total files processed: {len(files_to_dump)}")
         if schema_files:
             print("🗄️ Detected potential schema/migration files:")
-            for p in schema_files:
-                print("  -", p.relative_to(project_path))
+            for rel in schema_files:
+                print("  -", rel)
         else:
             print("ℹ️ No obvious schema/migration files detected.")
 